@@ -5,7 +5,21 @@ This package provides tools for simulating neural data and performing
 basic analysis pipelines commonly used in neuroscience research.
 """
 
-from python_4_neuroscience import neural_simulation, pca_analysis
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from python_4_neuroscience import neural_simulation, pca_analysis
 
 __all__ = ["neural_simulation", "pca_analysis"]
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str) -> Any:
+    # Import submodules on first access, so that importing the package does
+    # not load scikit-learn and matplotlib until they are needed
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
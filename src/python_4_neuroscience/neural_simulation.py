@@ -6,7 +6,182 @@ commonly encountered in neuroscience research.
 """
 
 import numpy as np
-from typing import Tuple, Optional
+from functools import cache
+from scipy import fft, sparse
+from typing import Any, Tuple, Optional, Union
+
+try:
+    import numba
+except ImportError:  # numba is an optional accelerator
+    numba = None  # type: ignore[assignment]
+
+
+def _refractory_keep(
+    spike_steps: np.ndarray, refractory_steps: int  # type: ignore[type-arg]
+) -> np.ndarray:  # type: ignore[type-arg]
+    """
+    Select which candidate spikes survive the refractory period.
+
+    Args:
+        spike_steps: Sorted time step indices of candidate spikes
+        refractory_steps: Minimum number of time steps between kept spikes
+
+    Returns:
+        Boolean array marking the candidate spikes to keep
+    """
+    # A candidate at least one refractory period after the previous candidate
+    # is always kept, since no kept spike can come later than that candidate
+    gaps = np.diff(spike_steps, prepend=spike_steps[:1] - refractory_steps)
+    keep = gaps >= refractory_steps
+
+    # Only candidates closely following another depend on which earlier
+    # spikes were kept; resolve those few in order
+    last_kept = 0
+    for j in np.flatnonzero(~keep).tolist():
+        if keep[j - 1]:
+            last_kept = spike_steps[j - 1]
+        keep[j] = spike_steps[j] - last_kept >= refractory_steps
+    return keep
+
+
+def _refractory_rows(
+    spikes: np.ndarray, refractory_steps: int  # type: ignore[type-arg]
+) -> None:
+    """
+    Remove refractory violations by scanning each neuron's time steps (numba kernel).
+
+    Args:
+        spikes: Boolean array of shape (n_neurons, n_steps), modified in place
+        refractory_steps: Minimum number of time steps between spikes
+    """
+    # Neurons are independent, so the parallel build splits rows across threads
+    for i in numba.prange(spikes.shape[0]):
+        next_allowed = 0
+        for t in range(spikes.shape[1]):
+            if spikes[i, t]:
+                if t >= next_allowed:
+                    next_allowed = t + refractory_steps
+                else:
+                    spikes[i, t] = False
+
+
+# Below this many time steps in total, starting threads costs more than it saves
+_PARALLEL_MIN_SIZE = 1_000_000
+
+if numba is not None:
+    # An explicit signature compiles the kernels eagerly (or loads them from
+    # the on-disk cache) at import, so the first simulation pays no JIT cost
+    _REFRACTORY_SIGNATURE = "void(b1[:, ::1], i8)"
+    _refractory_rows_serial = numba.njit(_REFRACTORY_SIGNATURE, cache=True)(
+        _refractory_rows
+    )
+    _refractory_rows_parallel = numba.njit(
+        _REFRACTORY_SIGNATURE, parallel=True, cache=True
+    )(_refractory_rows)
+
+
+def _enforce_refractory(
+    spikes: np.ndarray, refractory_steps: int  # type: ignore[type-arg]
+) -> None:
+    """
+    Remove spikes that fall within the refractory period of an earlier spike.
+
+    Args:
+        spikes: Boolean array of shape (n_neurons, n_steps), modified in place
+        refractory_steps: Minimum number of time steps between spikes
+    """
+    if numba is not None:
+        if spikes.size >= _PARALLEL_MIN_SIZE:
+            _refractory_rows_parallel(spikes, refractory_steps)
+        else:
+            _refractory_rows_serial(spikes, refractory_steps)
+        return
+
+    neurons, steps = np.nonzero(spikes)
+    # Space the rows apart by the refractory period so that spikes of
+    # different neurons can be processed as a single sorted sequence
+    flat_steps = neurons * (spikes.shape[1] + refractory_steps) + steps
+    dropped = ~_refractory_keep(flat_steps, refractory_steps)
+    spikes[neurons[dropped], steps[dropped]] = False
+
+
+# One CUDA thread per neuron walks that neuron's time steps. The raster is
+# stored time-major so that neighbouring threads read neighbouring bytes.
+_REFRACTORY_CUDA_SOURCE = r"""
+extern "C" __global__
+void refractory_columns(bool* spikes, long long n_neurons, long long n_steps,
+                        long long refractory_steps)
+{
+    long long neuron = blockIdx.x * (long long)blockDim.x + threadIdx.x;
+    if (neuron >= n_neurons) return;
+    long long next_allowed = 0;
+    for (long long t = 0; t < n_steps; ++t) {
+        bool* spike = spikes + t * n_neurons + neuron;
+        if (*spike) {
+            if (t >= next_allowed) next_allowed = t + refractory_steps;
+            else *spike = false;
+        }
+    }
+}
+"""
+
+
+@cache
+def _refractory_cuda_kernel() -> Any:
+    """
+    Compile the CUDA refractory kernel on first use.
+
+    Returns:
+        CuPy RawKernel enforcing the refractory period
+    """
+    import cupy as cp
+
+    return cp.RawKernel(_REFRACTORY_CUDA_SOURCE, "refractory_columns")
+
+
+def _generate_population_gpu(
+    prob_spike: np.ndarray,  # type: ignore[type-arg]
+    n_steps: int,
+    refractory_steps: int,
+    rng: np.random.Generator,
+) -> np.ndarray:  # type: ignore[type-arg]
+    """
+    Draw a population spike raster on the GPU with CuPy.
+
+    Args:
+        prob_spike: Spike probability per time step for each neuron
+        n_steps: Number of time steps
+        refractory_steps: Minimum number of time steps between spikes
+        rng: Host random number generator, used to seed the GPU generator
+
+    Returns:
+        2D ``uint8`` array of shape (n_neurons, n_steps), copied back to the host
+    """
+    try:
+        import cupy as cp
+    except ImportError as err:
+        raise ImportError("device='gpu' requires CuPy to be installed") from err
+
+    n_neurons = len(prob_spike)
+    gpu_rng = cp.random.default_rng(int(rng.integers(2**63)))
+    # Single precision halves the device memory of the uniform draws
+    uniform = gpu_rng.random((n_steps, n_neurons), dtype=cp.float32)
+    spikes = uniform < cp.asarray(prob_spike, dtype=cp.float32)[np.newaxis, :]
+    del uniform
+
+    threads_per_block = 128
+    n_blocks = (n_neurons + threads_per_block - 1) // threads_per_block
+    _refractory_cuda_kernel()(
+        (n_blocks,),
+        (threads_per_block,),
+        (spikes, np.int64(n_neurons), np.int64(n_steps), np.int64(refractory_steps)),
+    )
+
+    return cp.asnumpy(cp.ascontiguousarray(spikes.T)).view(np.uint8)  # type: ignore[no-any-return]
+
+
+# Number of uniforms drawn at once when building a dense population raster
+_DRAW_BLOCK_SIZE = 1 << 20
 
 
 def generate_spike_train(
@@ -14,7 +189,7 @@ def generate_spike_train(
     duration: float,
     dt: float = 0.001,
     refractory_period: float = 0.002,
-    seed: Optional[int] = None,
+    seed: Optional[Union[int, np.random.Generator]] = None,
 ) -> np.ndarray:  # type: ignore[type-arg]
     """
     Generate a Poisson spike train.
@@ -24,30 +199,24 @@ def generate_spike_train(
         duration: Duration of the spike train in seconds
         dt: Time step in seconds (default: 1ms)
         refractory_period: Refractory period in seconds (default: 2ms)
-        seed: Random seed for reproducibility
+        seed: Random seed or Generator for reproducibility
 
     Returns:
-        Binary array where 1 indicates a spike at that time step
+        Binary ``uint8`` array where 1 indicates a spike at that time step
     """
-    if seed is not None:
-        np.random.seed(seed)
+    rng = np.random.default_rng(seed)
 
     n_steps = int(duration / dt)
-    spike_train = np.zeros(n_steps)
-    refractory_steps = int(refractory_period / dt)
+    # A refractory period shorter than one time step imposes no constraint
+    refractory_steps = max(int(refractory_period / dt), 1)
 
-    # Generate spikes based on Poisson process
+    # Draw a Bernoulli sample for every time step at once, then drop the
+    # candidate spikes that fall inside the refractory period of a kept spike
     prob_spike = rate * dt
+    spike_train = rng.random(n_steps) < prob_spike
+    _enforce_refractory(spike_train[np.newaxis, :], refractory_steps)
 
-    i = 0
-    while i < n_steps:
-        if np.random.random() < prob_spike:
-            spike_train[i] = 1
-            i += refractory_steps  # Skip refractory period
-        else:
-            i += 1
-
-    return spike_train
+    return spike_train.view(np.uint8)
 
 
 def generate_neural_population(
@@ -56,7 +225,9 @@ def generate_neural_population(
     base_rate: float = 10.0,
     rate_variance: float = 5.0,
     dt: float = 0.001,
-    seed: Optional[int] = None,
+    seed: Optional[Union[int, np.random.Generator]] = None,
+    refractory_period: float = 0.002,
+    device: str = "cpu",
 ) -> np.ndarray:  # type: ignore[type-arg]
     """
     Generate activity from a population of neurons.
@@ -67,34 +238,132 @@ def generate_neural_population(
         base_rate: Mean firing rate across the population in Hz
         rate_variance: Standard deviation of firing rates in Hz
         dt: Time step in seconds
-        seed: Random seed for reproducibility
+        seed: Random seed or Generator for reproducibility
+        refractory_period: Refractory period in seconds (default: 2ms)
+        device: 'cpu', or 'gpu' to draw the spikes on a CUDA GPU with CuPy
 
     Returns:
-        2D array of shape (n_neurons, n_time_steps) with spike trains
+        2D ``uint8`` array of shape (n_neurons, n_time_steps) with spike trains
     """
-    if seed is not None:
-        np.random.seed(seed)
+    if device not in ("cpu", "gpu"):
+        raise ValueError(f"Unknown device: {device}. Use 'cpu' or 'gpu'")
+
+    rng = np.random.default_rng(seed)
 
     # Generate firing rates for each neuron
-    rates = np.random.normal(base_rate, rate_variance, n_neurons)
+    rates = rng.normal(base_rate, rate_variance, n_neurons)
     rates = np.maximum(rates, 0.1)  # Ensure positive rates
 
-    # Generate spike trains for each neuron
+    # Generate spike trains for all neurons at once
     n_steps = int(duration / dt)
-    population_activity = np.zeros((n_neurons, n_steps))
+    refractory_steps = max(int(refractory_period / dt), 1)
+    if device == "gpu":
+        return _generate_population_gpu(rates * dt, n_steps, refractory_steps, rng)
+
+    # Threshold single precision uniforms a block of neurons at a time, so
+    # the temporary stays bounded however large the raster is
+    prob_spike = (rates * dt).astype(np.float32)[:, np.newaxis]
+    population_activity = np.empty((n_neurons, n_steps), dtype=bool)
+    block = max(1, _DRAW_BLOCK_SIZE // max(n_steps, 1))
+    for start in range(0, n_neurons, block):
+        stop = min(start + block, n_neurons)
+        uniform = rng.random((stop - start, n_steps), dtype=np.float32)
+        np.less(uniform, prob_spike[start:stop], out=population_activity[start:stop])
+    _enforce_refractory(population_activity, refractory_steps)
+
+    return population_activity.view(np.uint8)
 
-    for i in range(n_neurons):
-        population_activity[i, :] = generate_spike_train(
-            rate=rates[i], duration=duration, dt=dt, seed=seed + i if seed else None
-        )
 
-    return population_activity
+def generate_neural_population_sparse(
+    n_neurons: int,
+    duration: float,
+    base_rate: float = 10.0,
+    rate_variance: float = 5.0,
+    dt: float = 0.001,
+    seed: Optional[Union[int, np.random.Generator]] = None,
+    refractory_period: float = 0.002,
+) -> sparse.csr_matrix:
+    """
+    Generate population activity as a sparse spike raster.
+
+    Statistically equivalent to generate_neural_population, but only the
+    spikes are generated and stored, so memory scales with the number of
+    spikes rather than the number of time steps.
+
+    Args:
+        n_neurons: Number of neurons in the population
+        duration: Duration of recording in seconds
+        base_rate: Mean firing rate across the population in Hz
+        rate_variance: Standard deviation of firing rates in Hz
+        dt: Time step in seconds
+        seed: Random seed or Generator for reproducibility
+        refractory_period: Refractory period in seconds (default: 2ms)
+
+    Returns:
+        CSR matrix of shape (n_neurons, n_time_steps) with ``uint8`` spikes.
+        Its ``indptr`` holds the offset of each neuron's spike times in
+        ``indices``.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Generate firing rates for each neuron
+    rates = rng.normal(base_rate, rate_variance, n_neurons)
+    rates = np.maximum(rates, 0.1)  # Ensure positive rates
+
+    n_steps = int(duration / dt)
+    refractory_steps = max(int(refractory_period / dt), 1)
+    prob_spike = np.minimum(rates * dt, 1.0)
+    if n_neurons == 0:
+        return sparse.csr_matrix((0, n_steps), dtype=np.uint8)
+
+    # Once the refractory period is over, the number of steps until the next
+    # spike is geometrically distributed, so draw inter-spike intervals
+    # directly. Each row starts from a virtual spike one refractory period
+    # before the recording, and gets enough draws for its own expected
+    # spike count; rows that still fall short are topped up.
+    expected_spikes = n_steps / (refractory_steps - 1 + 1 / prob_spike)
+    n_draw = (1.2 * expected_spikes).astype(np.int64) + 10
+    last_spike = np.full(n_neurons, -refractory_steps, dtype=np.int64)
+    n_kept = np.zeros(n_neurons, dtype=np.int64)
+    rows = np.arange(n_neurons)
+    rounds = []
+    while len(rows):
+        counts = n_draw[rows]
+        steps = rng.geometric(np.repeat(prob_spike[rows], counts))
+        steps += refractory_steps - 1
+        # Accumulate the intervals of all rows at once, then restart the
+        # running sum of each row at that row's last spike
+        np.cumsum(steps, out=steps)
+        ends = np.cumsum(counts)
+        carried = np.concatenate([[0], steps[ends[:-1] - 1]])
+        steps += np.repeat(last_spike[rows] - carried, counts)
+        last_spike[rows] = steps[ends - 1]
+
+        in_range = steps < n_steps
+        row_kept = np.add.reduceat(in_range, ends - counts)
+        n_kept[rows] += row_kept
+        rounds.append((rows, row_kept, steps[in_range]))
+        del steps, in_range
+        rows = rows[last_spike[rows] < n_steps]
+
+    indptr = np.concatenate([[0], np.cumsum(n_kept)])
+    if len(rounds) == 1:
+        indices = rounds[0][2]
+    else:
+        # Later rounds only extend rows, so a stable sort by row keeps each
+        # row's spike times in order
+        spike_rows = np.concatenate([np.repeat(r, k) for r, k, _ in rounds])
+        order = np.argsort(spike_rows, kind="stable")
+        indices = np.concatenate([steps for _, _, steps in rounds])[order]
+    data = np.ones(len(indices), dtype=np.uint8)
+
+    return sparse.csr_matrix((data, indices, indptr), shape=(n_neurons, n_steps))
 
 
 def add_noise(
     signal: np.ndarray,  # type: ignore[type-arg]
     noise_level: float = 0.1,
-    seed: Optional[int] = None,
+    seed: Optional[Union[int, np.random.Generator]] = None,
 ) -> np.ndarray:  # type: ignore[type-arg]
     """
     Add Gaussian noise to a signal.
@@ -102,17 +371,109 @@ def add_noise(
     Args:
         signal: Input signal array
         noise_level: Standard deviation of noise relative to signal std
-        seed: Random seed for reproducibility
+        seed: Random seed or Generator for reproducibility
 
     Returns:
         Noisy signal
     """
-    if seed is not None:
-        np.random.seed(seed)
+    rng = np.random.default_rng(seed)
+
+    # Scale and offset the noise in place, so its buffer becomes the output
+    noise = rng.standard_normal(signal.shape)
+    noise *= noise_level * np.std(signal)
+    noise += signal
+    return noise
+
+
+def _sum_of_sinusoids(
+    time: np.ndarray,  # type: ignore[type-arg]
+    sampling_rate: float,
+    frequencies: np.ndarray,  # type: ignore[type-arg]
+    amplitudes: np.ndarray,  # type: ignore[type-arg]
+) -> np.ndarray:  # type: ignore[type-arg]
+    """
+    Evaluate a sum of zero-phase sinusoids on a uniform time grid.
+
+    Args:
+        time: Sample times in seconds, spaced by 1 / sampling_rate
+        sampling_rate: Sampling rate in Hz
+        frequencies: Frequency of each component in Hz
+        amplitudes: Amplitude of each component
+
+    Returns:
+        Summed signal with one value per sample time
+    """
+    n_samples = len(time)
+    bins = frequencies * n_samples / sampling_rate
+    fft_bins = np.round(bins).astype(np.int64)
+
+    # With many components, build the spectrum and invert it once
+    # (O(N log N)), but only when every frequency falls exactly on an FFT bin
+    # so the result matches direct evaluation
+    if (
+        n_samples >= 2
+        and len(frequencies) > np.log2(n_samples)
+        and np.all(np.abs(bins - fft_bins) < 1e-9)
+        and np.all((fft_bins >= 0) & (fft_bins <= n_samples // 2))
+    ):
+        spectrum = np.zeros(n_samples // 2 + 1, dtype=complex)
+        np.add.at(spectrum, fft_bins, -0.5j * n_samples * amplitudes)
+        return fft.irfft(spectrum, n=n_samples)  # type: ignore[no-any-return]
+
+    # Otherwise evaluate all components in one (n_components, n_samples)
+    # buffer and weight them with a single matvec
+    phases = np.multiply.outer(2 * np.pi * frequencies, time)
+    np.sin(phases, out=phases)
+    return amplitudes @ phases  # type: ignore[no-any-return]
+
+
+# J. O. Smith's IIR approximation of a 1/f (pink) spectrum
+_PINK_B = (0.049922035, -0.095993537, 0.050612699, -0.004408786)
+_PINK_A = (1.0, -2.494956002, 2.017265875, -0.522189400)
+
+
+def _colored_noise(
+    n_samples: int,
+    color: str,
+    dt: float,
+    tau: float,
+    rng: np.random.Generator,
+) -> np.ndarray:  # type: ignore[type-arg]
+    """
+    Generate unit-variance colored Gaussian noise by filtering white noise.
+
+    Args:
+        n_samples: Number of samples
+        color: 'pink' or 'ou'
+        dt: Time step in seconds
+        tau: Correlation time of 'ou' noise in seconds
+        rng: Random number generator
+
+    Returns:
+        Noise array of length n_samples
+    """
+    # scipy.signal is slow to import, so it is only loaded for colored noise
+    from scipy.signal import lfilter
+
+    white = rng.standard_normal(n_samples)
+    # A single sample of either process is just a standard normal draw
+    if n_samples <= 1:
+        return white
+
+    if color == "ou":
+        # Exact AR(1) discretization of an Ornstein-Uhlenbeck process, started
+        # from its stationary distribution
+        alpha = np.exp(-dt / tau)
+        noise, _ = lfilter(
+            [np.sqrt(1 - alpha**2)],
+            [1, -alpha],
+            white,
+            zi=[alpha * rng.standard_normal()],
+        )
+        return noise  # type: ignore[no-any-return]
 
-    signal_std = np.std(signal)
-    noise = np.random.normal(0, noise_level * signal_std, signal.shape)
-    return signal + noise  # type: ignore[no-any-return]
+    noise = lfilter(_PINK_B, _PINK_A, white)
+    return noise / np.std(noise)  # type: ignore[no-any-return]
 
 
 def generate_lfp_signal(
@@ -121,7 +482,9 @@ def generate_lfp_signal(
     frequencies: Tuple[float, ...] = (4.0, 8.0, 30.0),
     amplitudes: Tuple[float, ...] = (1.0, 0.5, 0.3),
     noise_level: float = 0.1,
-    seed: Optional[int] = None,
+    seed: Optional[Union[int, np.random.Generator]] = None,
+    noise_color: str = "white",
+    noise_tau: float = 0.01,
 ) -> Tuple[np.ndarray, np.ndarray]:  # type: ignore[type-arg]
     """
     Generate a simulated Local Field Potential (LFP) signal.
@@ -131,28 +494,47 @@ def generate_lfp_signal(
         sampling_rate: Sampling rate in Hz
         frequencies: Tuple of frequency components in Hz
         amplitudes: Tuple of amplitudes for each frequency
-        noise_level: Noise standard deviation
-        seed: Random seed for reproducibility
+        noise_level: Noise standard deviation relative to signal std
+        seed: Random seed or Generator for reproducibility
+        noise_color: Noise spectrum: 'white', 'pink' (1/f) or 'ou'
+                     (Ornstein-Uhlenbeck, exponentially correlated)
+        noise_tau: Correlation time of 'ou' noise in seconds
 
     Returns:
         Tuple of (time_array, lfp_signal)
     """
-    if seed is not None:
-        np.random.seed(seed)
+    rng = np.random.default_rng(seed)
 
     if len(frequencies) != len(amplitudes):
         raise ValueError("frequencies and amplitudes must have the same length")
+    if noise_color not in ("white", "pink", "ou"):
+        raise ValueError(
+            f"Unknown noise_color: {noise_color}. Use 'white', 'pink' or 'ou'"
+        )
 
     n_samples = int(duration * sampling_rate)
-    time = np.linspace(0, duration, n_samples)
+    time = np.arange(n_samples) / sampling_rate
 
     # Generate signal as sum of sinusoids
-    signal = np.zeros(n_samples)
-    for freq, amp in zip(frequencies, amplitudes):
-        signal += amp * np.sin(2 * np.pi * freq * time)
+    signal = _sum_of_sinusoids(
+        time,
+        sampling_rate,
+        np.asarray(frequencies, dtype=float),
+        np.asarray(amplitudes, dtype=float),
+    )
+    # An empty recording has no signal spread to scale the noise to
+    if n_samples == 0:
+        return time, signal
 
     # Add noise
-    signal = add_noise(signal, noise_level, seed)
+    if noise_color == "white":
+        signal = add_noise(signal, noise_level, rng)
+    else:
+        noise = _colored_noise(
+            n_samples, noise_color, 1 / sampling_rate, noise_tau, rng
+        )
+        noise *= noise_level * np.std(signal)
+        signal += noise
 
     return time, signal  # type: ignore[return-value]
 
@@ -164,19 +546,22 @@ def bin_spike_train(
     Bin a spike train into larger time windows.
 
     Args:
-        spike_train: Binary spike train array
+        spike_train: Binary spike train array (e.g. ``uint8`` or ``bool``)
         bin_size: Number of time steps per bin
         method: Binning method ('sum' or 'mean')
 
     Returns:
-        Binned spike train
+        Binned spike train (``int64`` counts for integer input with 'sum').
+        If the length is not a multiple of bin_size, the last bin is shorter.
     """
-    n_bins = len(spike_train) // bin_size
-    reshaped = spike_train[: n_bins * bin_size].reshape(n_bins, bin_size)
+    bin_starts = np.arange(0, len(spike_train), bin_size)
 
     if method == "sum":
-        return np.sum(reshaped, axis=1)  # type: ignore[no-any-return]
+        # Accumulate integer rasters in a wide signed type, not their uint8 storage
+        dtype = np.int64 if spike_train.dtype.kind in "biu" else None
+        return np.add.reduceat(spike_train, bin_starts, dtype=dtype)  # type: ignore[no-any-return]
     elif method == "mean":
-        return np.mean(reshaped, axis=1)  # type: ignore[no-any-return]
+        sums = np.add.reduceat(spike_train, bin_starts, dtype=np.float64)
+        return sums / np.diff(bin_starts, append=len(spike_train))  # type: ignore[no-any-return]
     else:
         raise ValueError(f"Unknown method: {method}. Use 'sum' or 'mean'")
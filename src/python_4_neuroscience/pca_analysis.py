@@ -6,70 +6,241 @@ on neural data, a fundamental dimensionality reduction technique in neuroscience
 """
 
 import numpy as np
-from sklearn.decomposition import PCA
-from typing import Tuple, Optional
-import matplotlib.pyplot as plt
+from functools import cache
+from scipy import linalg, sparse
+from typing import TYPE_CHECKING, Tuple, Optional
+
+# scikit-learn and matplotlib are slow to import, so they are only loaded
+# by the functions that use them
+if TYPE_CHECKING:
+    from matplotlib.axes import Axes
+    from matplotlib.figure import Figure
+    from sklearn.decomposition import PCA
+
+
+@cache
+def _pca_class() -> "type[PCA]":
+    """
+    Import the PCA implementation on first use.
+
+    Returns:
+        The scikit-learn-intelex PCA if installed, else scikit-learn's PCA
+    """
+    try:
+        # scikit-learn-intelex provides a drop-in PCA backed by oneDAL/MKL
+        from sklearnex.decomposition import PCA
+    except ImportError:
+        from sklearn.decomposition import PCA
+    return PCA  # type: ignore[no-any-return]
+
+
+def _std_from_moments(
+    mean: np.ndarray,  # type: ignore[type-arg]
+    mean_sq: np.ndarray,  # type: ignore[type-arg]
+    n_samples: int,
+) -> np.ndarray:  # type: ignore[type-arg]
+    """
+    Compute per-feature standard deviations from the first two moments.
+
+    The moments may be taken about any per-feature shift. Taking them about
+    a value close to the mean avoids cancellation in ``mean_sq - mean**2``.
+
+    Args:
+        mean: Mean of each feature, minus the shift
+        mean_sq: Mean of the squared values of each feature, minus the shift
+        n_samples: Number of samples the moments were computed over
+
+    Returns:
+        Standard deviation of each feature, with constant features set to 1
+    """
+    var = mean_sq - mean**2
+    std = np.sqrt(np.maximum(var, 0))
+    # Avoid division by zero. Rounding in the sums can leave a small residue
+    # for constant features, so treat variances below that precision as zero.
+    std[var <= n_samples * np.finfo(np.float64).eps * mean**2] = 1
+    return std  # type: ignore[no-any-return]
+
+
+# Number of elements in each float64 scratch block of _feature_moments
+_MOMENT_BLOCK_SIZE = 1 << 16
+
+
+def _feature_moments(
+    data: np.ndarray,  # type: ignore[type-arg]
+) -> Tuple[np.ndarray, np.ndarray]:  # type: ignore[type-arg]
+    """
+    Compute the mean and standard deviation of each feature in one pass.
+
+    The moments are accumulated about the first sample, which lies within
+    the spread of each feature, so a large mean does not cancel out the
+    variance. Samples are shifted a cache-sized block at a time, so no
+    copy of the data is made.
+
+    Args:
+        data: Dense data array of shape (n_samples, n_features)
+
+    Returns:
+        Tuple of (mean, standard deviation) of each feature in float64, with
+        constant features given a standard deviation of 1
+    """
+    n_samples, n_features = data.shape
+    shift = data[0].astype(np.float64)
+    sum_shifted = np.zeros(n_features)
+    sum_sq_shifted = np.zeros(n_features)
+    block = max(1, _MOMENT_BLOCK_SIZE // max(n_features, 1))
+    for start in range(0, n_samples, block):
+        shifted = np.subtract(data[start : start + block], shift, dtype=np.float64)
+        sum_shifted += shifted.sum(axis=0)
+        sum_sq_shifted += np.einsum("ij,ij->j", shifted, shifted)
+
+    mean_shifted = sum_shifted / n_samples
+    std = _std_from_moments(mean_shifted, sum_sq_shifted / n_samples, n_samples)
+    return shift + mean_shifted, std
 
 
 def prepare_data_for_pca(
-    neural_data: np.ndarray, normalize: bool = True  # type: ignore[type-arg]
+    neural_data: np.ndarray,  # type: ignore[type-arg]
+    normalize: bool = True,
+    center: bool = True,
 ) -> np.ndarray:  # type: ignore[type-arg]
     """
     Prepare neural data for PCA analysis.
 
     Args:
-        neural_data: 2D array of shape (n_neurons, n_time_steps)
+        neural_data: 2D array of shape (n_neurons, n_time_steps), e.g. a
+                     ``uint8`` spike raster, or a scipy sparse matrix
         normalize: Whether to normalize each neuron's activity
+        center: Whether normalization subtracts each neuron's mean. PCA
+                centers the data itself, so center=False saves a pass over
+                the data when it is only passed on to perform_pca.
 
     Returns:
-        Prepared data of shape (n_time_steps, n_neurons)
+        Prepared data of shape (n_time_steps, n_neurons). Normalized data
+        keeps a floating point input dtype and is float64 otherwise; without
+        normalization this is a view with the input dtype.
+        Sparse input stays sparse and is scaled but not centered, since
+        centering would densify it; perform_pca centers it implicitly.
     """
     # Transpose to get samples x features format
     data = neural_data.T
 
-    if normalize:
+    # Floating point input (e.g. float32) keeps its precision, which halves the
+    # memory traffic of normalization and PCA; integer rasters become float64
+    dtype = data.dtype if np.issubdtype(data.dtype, np.floating) else np.float64
+
+    if normalize and sparse.issparse(data):
+        # Scale each neuron to unit variance without touching the zeros
+        mean = np.asarray(data.mean(axis=0)).ravel()
+        # Square in float64, since integer counts would overflow their dtype
+        squared = data.astype(np.float64, copy=False).power(2)
+        mean_sq = np.asarray(squared.mean(axis=0)).ravel()
+        inv_std = 1 / _std_from_moments(mean, mean_sq, data.shape[0])
+        data = data @ sparse.diags(inv_std.astype(dtype))
+    elif normalize:
         # Normalize each neuron (feature) to have zero mean and unit variance
-        mean = np.mean(data, axis=0)
-        std = np.std(data, axis=0)
-        # Avoid division by zero
-        std[std == 0] = 1
-        data = (data - mean) / std
+        mean, std = _feature_moments(data)
+        inv_std = 1 / std
+        # Write the output once and scale it in place. The buffer keeps the
+        # layout of the transposed input, which avoids a strided copy, and
+        # multiplying by the reciprocal is cheaper than dividing.
+        if center:
+            data = np.subtract(data, mean, dtype=dtype)
+            data *= inv_std
+        else:
+            data = np.multiply(data, inv_std, dtype=dtype)
 
     return data  # type: ignore[no-any-return]
 
 
+def _select_svd_solver(
+    data: np.ndarray, n_components: Optional[int]  # type: ignore[type-arg]
+) -> str:
+    """
+    Choose the scikit-learn PCA solver best suited to the shape of the data.
+
+    Args:
+        data: Data array of shape (n_samples, n_features), dense or sparse
+        n_components: Number of components requested (None if chosen by variance)
+
+    Returns:
+        Name of the svd_solver to pass to PCA
+    """
+    n_samples, n_features = data.shape
+    min_dim = min(n_samples, n_features)
+
+    # Many more time steps than neurons: eigendecompose the small
+    # (n_features, n_features) covariance matrix instead of taking the SVD of
+    # the data. This also centers sparse data without densifying it.
+    if n_features <= 1000 and n_samples >= 10 * n_features:
+        return "covariance_eigh"
+    if sparse.issparse(data):
+        if n_components is not None and n_components < min_dim:
+            return "arpack"
+        return "covariance_eigh"
+    # Moderately tall data: the covariance route still beats a full SVD, but
+    # for a handful of components of many neurons randomized SVD is faster
+    if n_features <= 1000 and n_samples > 4 * n_features:
+        if n_features <= 250 or n_components is None or n_components >= n_features / 20:
+            return "covariance_eigh"
+    # A fixed number of components well below the rank of a large matrix:
+    # randomized SVD costs O(n_samples * n_features * n_components) instead of
+    # a full SVD. Small matrices keep the exact solver, which is cheap anyway.
+    if (
+        n_components is not None
+        and max(n_samples, n_features) > 500
+        and n_components < 0.8 * min_dim
+    ):
+        return "randomized"
+    return "full"
+
+
 def perform_pca(
     data: np.ndarray,  # type: ignore[type-arg]
     n_components: Optional[int] = None,
     variance_threshold: float = 0.95,
-) -> Tuple[PCA, np.ndarray]:  # type: ignore[type-arg]
+    check_finite: bool = True,
+) -> Tuple["PCA", np.ndarray]:  # type: ignore[type-arg]
     """
     Perform PCA on neural data.
 
     Args:
-        data: Data array of shape (n_samples, n_features)
+        data: Data array of shape (n_samples, n_features), dense or sparse
         n_components: Number of components to keep (if None, determined by variance_threshold)
         variance_threshold: Fraction of variance to preserve (default: 0.95)
+        check_finite: Whether to check the data for NaN and inf values.
+                      Disabling this skips a full pass over the data, but
+                      non-finite input then gives meaningless results.
 
     Returns:
         Tuple of (fitted PCA model, transformed data)
     """
-    if n_components is None:
-        # First fit with all components to determine n_components
-        pca_temp = PCA()
-        pca_temp.fit(data)
-        cumulative_variance = np.cumsum(pca_temp.explained_variance_ratio_)
-        n_components = int(np.argmax(cumulative_variance >= variance_threshold) + 1)
+    svd_solver = _select_svd_solver(data, n_components)
+
+    # A fractional n_components makes scikit-learn keep the smallest number of
+    # components that explains variance_threshold, from a single fit. A
+    # threshold of zero or less is met by the first component alone.
+    n_keep: Optional[float] = n_components
+    if n_components is None and variance_threshold <= 0:
+        n_keep = 1
+    elif n_components is None and variance_threshold < 1:
+        n_keep = variance_threshold
+
+    pca = _pca_class()(n_components=n_keep, svd_solver=svd_solver, random_state=0)
+    if check_finite:
+        transformed_data = pca.fit_transform(data)
+    else:
+        from sklearn import config_context
 
-    pca = PCA(n_components=n_components)
-    transformed_data = pca.fit_transform(data)
+        # Skip scikit-learn's scan of the input for non-finite values
+        with config_context(assume_finite=True):
+            transformed_data = pca.fit_transform(data)
 
     return pca, transformed_data
 
 
 def plot_variance_explained(
-    pca: PCA, figsize: Tuple[int, int] = (12, 4), save_path: Optional[str] = None
-) -> plt.Figure:
+    pca: "PCA", figsize: Tuple[int, int] = (12, 4), save_path: Optional[str] = None
+) -> "Figure":
     """
     Plot the variance explained by principal components.
 
@@ -81,6 +252,8 @@ def plot_variance_explained(
     Returns:
         Matplotlib figure object
     """
+    import matplotlib.pyplot as plt
+
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=figsize)
 
     # Individual variance explained
@@ -118,7 +291,8 @@ def plot_pca_projection(
     labels: Optional[np.ndarray] = None,  # type: ignore[type-arg]
     figsize: Tuple[int, int] = (8, 6),
     save_path: Optional[str] = None,
-) -> plt.Figure:
+    ax: Optional["Axes"] = None,
+) -> "Figure":
     """
     Plot data projected onto two principal components.
 
@@ -127,13 +301,20 @@ def plot_pca_projection(
         pc_x: Index of PC for x-axis (0-indexed)
         pc_y: Index of PC for y-axis (0-indexed)
         labels: Optional labels for coloring points
-        figsize: Figure size (width, height)
+        figsize: Figure size (width, height), ignored if ax is given
         save_path: Path to save the figure (optional)
+        ax: Existing axes to draw onto (optional). Reusing axes avoids
+            creating a new figure for every plot.
 
     Returns:
-        Matplotlib figure object
+        Matplotlib figure object containing the axes
     """
-    fig, ax = plt.subplots(figsize=figsize)
+    import matplotlib.pyplot as plt
+
+    if ax is None:
+        fig, ax = plt.subplots(figsize=figsize)
+    else:
+        fig = ax.figure  # type: ignore[assignment]
 
     if labels is not None:
         scatter = ax.scatter(
@@ -143,7 +324,7 @@ def plot_pca_projection(
             cmap="viridis",
             alpha=0.6,
         )
-        plt.colorbar(scatter, ax=ax, label="Label")
+        fig.colorbar(scatter, ax=ax, label="Label")
     else:
         ax.scatter(
             transformed_data[:, pc_x], transformed_data[:, pc_y], alpha=0.6, s=20
@@ -155,13 +336,13 @@ def plot_pca_projection(
     ax.grid(True, alpha=0.3)
 
     if save_path:
-        plt.savefig(save_path, dpi=300, bbox_inches="tight")
+        fig.savefig(save_path, dpi=300, bbox_inches="tight")
 
     return fig
 
 
 def reconstruct_from_pca(
-    pca: PCA,
+    pca: "PCA",
     transformed_data: np.ndarray,  # type: ignore[type-arg]
     n_components: Optional[int] = None,
 ) -> np.ndarray:  # type: ignore[type-arg]
@@ -177,21 +358,25 @@ def reconstruct_from_pca(
     Returns:
         Reconstructed data in original space
     """
-    if n_components is not None and n_components < transformed_data.shape[1]:  # type: ignore[index]
-        # Use only first n_components
-        partial_data = transformed_data[:, :n_components]
-        # Reconstruct
-        reconstruction = pca.mean_ + np.dot(
-            partial_data, pca.components_[:n_components]
-        )
-    else:
-        reconstruction = pca.inverse_transform(transformed_data)
+    n_available = transformed_data.shape[1]  # type: ignore[index]
+    k = n_available if n_components is None else min(n_components, n_available)
+    partial_data = transformed_data[:, :k]
+    components = pca.components_[:k]
+    if pca.whiten:
+        components = components * np.sqrt(pca.explained_variance_[:k, np.newaxis])
+
+    # Call BLAS gemm directly (sgemm or dgemm to match the data) on the
+    # transposed, Fortran-ordered operands: it computes the transpose of the
+    # reconstruction, whose own transpose is C-ordered without any copy
+    gemm = linalg.blas.get_blas_funcs("gemm", (partial_data, components))
+    reconstruction = gemm(1.0, components.T, partial_data.T).T
+    np.add(reconstruction, pca.mean_, out=reconstruction)
 
     return reconstruction  # type: ignore[no-any-return]
 
 
 def get_component_loadings(
-    pca: PCA, feature_names: Optional[list] = None
+    pca: "PCA", feature_names: Optional[list] = None
 ) -> np.ndarray:  # type: ignore[type-arg]
     """
     Get the loadings (weights) of each feature on the principal components.
@@ -0,0 +1,21 @@
+"""
+Shared pytest configuration.
+"""
+
+import sys
+
+import matplotlib
+import pytest
+
+# Render figures off-screen, so plotting tests never start a GUI backend
+matplotlib.use("Agg")
+
+
+@pytest.fixture(autouse=True)
+def close_figures():
+    """Close all figures after each test to bound memory use."""
+    yield
+    # Only tests that plotted will have imported pyplot
+    pyplot = sys.modules.get("matplotlib.pyplot")
+    if pyplot is not None:
+        pyplot.close("all")
@@ -2,10 +2,17 @@
 Tests for the neural_simulation module.
 """
 
+import sys
+
 import numpy as np
+import pytest
+from python_4_neuroscience import neural_simulation
 from python_4_neuroscience.neural_simulation import (
+    add_noise,
+    bin_spike_train,
     generate_spike_train,
     generate_neural_population,
+    generate_neural_population_sparse,
     generate_lfp_signal,
 )
 
@@ -17,11 +24,119 @@ def test_generate_spike_train():
     assert len(spike_train) == 1000
 
 
+def test_generate_spike_train_refractory_period():
+    """Test that spikes are separated by at least the refractory period."""
+    spike_train = generate_spike_train(
+        rate=200.0, duration=2.0, refractory_period=0.005, seed=42
+    )
+    assert np.all(np.diff(np.flatnonzero(spike_train)) >= 5)
+    np.testing.assert_array_equal(
+        spike_train,
+        generate_spike_train(
+            rate=200.0, duration=2.0, refractory_period=0.005, seed=42
+        ),
+    )
+
+
+def _refractory_reference(spikes, refractory_steps):
+    """Enforce the refractory period by walking each spike train in order."""
+    expected = spikes.copy()
+    for row in expected:
+        next_allowed = 0
+        for t in np.flatnonzero(row):
+            if t >= next_allowed:
+                next_allowed = t + refractory_steps
+            else:
+                row[t] = False
+    return expected
+
+
+@pytest.mark.parametrize("backend", ["numpy", "numba", "numba_parallel"])
+def test_enforce_refractory_backends(backend, monkeypatch):
+    """Test each refractory implementation against a sequential reference."""
+    if backend == "numpy":
+        monkeypatch.setattr(neural_simulation, "numba", None)
+    elif neural_simulation.numba is None:
+        pytest.skip("numba is not installed")
+    elif backend == "numba_parallel":
+        monkeypatch.setattr(neural_simulation, "_PARALLEL_MIN_SIZE", 0)
+
+    rng = np.random.default_rng(42)
+    for _ in range(100):
+        spikes = rng.random((5, 200)) < rng.uniform(0.01, 0.9)
+        refractory_steps = int(rng.integers(1, 8))
+        expected = _refractory_reference(spikes, refractory_steps)
+        neural_simulation._enforce_refractory(spikes, refractory_steps)
+        np.testing.assert_array_equal(spikes, expected)
+
+
 def test_generate_neural_population():
     """Test neural population generation."""
     population = generate_neural_population(n_neurons=10, duration=1.0, seed=42)
     assert population.shape == (10, 1000)
+    assert population.dtype == np.uint8
+    assert np.all((population == 0) | (population == 1))
+
+    # The seed keeps its position after dt
+    np.testing.assert_array_equal(
+        generate_neural_population(10, 1.0, 10.0, 5.0, 0.001, 42), population
+    )
+
+
+def test_generate_neural_population_unknown_device():
+    """Test that an unknown device name is rejected."""
+    with pytest.raises(ValueError):
+        generate_neural_population(n_neurons=10, duration=1.0, device="tpu")
+
+
+def test_generate_neural_population_gpu_without_cupy(monkeypatch):
+    """Test that device='gpu' reports a missing CuPy installation."""
+    monkeypatch.setitem(sys.modules, "cupy", None)
+    with pytest.raises(ImportError, match="CuPy"):
+        generate_neural_population(n_neurons=10, duration=1.0, device="gpu")
+
+
+def test_generate_neural_population_gpu():
+    """Test population generation on a CUDA GPU."""
+    pytest.importorskip("cupy")
+    population = generate_neural_population(
+        n_neurons=10, duration=2.0, base_rate=100.0, seed=42, device="gpu"
+    )
+    assert population.shape == (10, 2000)
+    assert population.dtype == np.uint8
     assert np.all((population == 0) | (population == 1))
+    for row in population:
+        assert np.all(np.diff(np.flatnonzero(row)) >= 2)
+
+
+def test_generate_neural_population_sparse():
+    """Test sparse neural population generation."""
+    population = generate_neural_population_sparse(
+        n_neurons=10, duration=5.0, base_rate=100.0, seed=42
+    )
+    assert population.shape == (10, 5000)
+    assert population.dtype == np.uint8
+    dense = population.toarray()
+    assert np.all((dense == 0) | (dense == 1))
+    for row in dense:
+        assert np.all(np.diff(np.flatnonzero(row)) >= 2)
+    # Mean firing rate should be close to the requested base rate
+    assert 80 < population.sum() / (10 * 5.0) < 110
+
+    empty = generate_neural_population_sparse(n_neurons=0, duration=1.0, seed=42)
+    assert empty.shape == (0, 1000)
+    assert empty.dtype == np.uint8
+
+
+def test_add_noise_seed():
+    """Test that noise is reproducible from a seed or a Generator."""
+    signal = np.sin(np.linspace(0, 10, 500))
+    np.testing.assert_array_equal(
+        add_noise(signal, seed=42), add_noise(signal, seed=42)
+    )
+    np.testing.assert_array_equal(
+        add_noise(signal, seed=np.random.default_rng(42)), add_noise(signal, seed=42)
+    )
 
 
 def test_generate_lfp_signal():
@@ -29,3 +144,68 @@ def test_generate_lfp_signal():
     time, lfp = generate_lfp_signal(duration=1.0, seed=42)
     assert len(time) == len(lfp)
     assert time[0] == 0
+
+
+def test_generate_lfp_signal_many_components():
+    """Test that many-component LFPs match a direct sum of sinusoids."""
+    frequencies = tuple(float(f) for f in range(1, 40))
+    amplitudes = tuple(1.0 / f for f in frequencies)
+    time, lfp = generate_lfp_signal(
+        duration=2.0, frequencies=frequencies, amplitudes=amplitudes, noise_level=0.0
+    )
+    np.testing.assert_allclose(np.diff(time), 0.001)
+    expected = sum(
+        a * np.sin(2 * np.pi * f * time) for f, a in zip(frequencies, amplitudes)
+    )
+    np.testing.assert_allclose(lfp, expected, atol=1e-10)
+
+    time, lfp = generate_lfp_signal(
+        duration=0.0, frequencies=frequencies, amplitudes=amplitudes, noise_level=0.0
+    )
+    assert time.shape == lfp.shape == (0,)
+
+
+def test_generate_lfp_signal_ou_noise():
+    """Test that Ornstein-Uhlenbeck noise is temporally correlated."""
+    time, clean = generate_lfp_signal(duration=20.0, noise_level=0.0)
+    _, noisy = generate_lfp_signal(
+        duration=20.0, noise_level=0.5, noise_color="ou", noise_tau=0.05, seed=42
+    )
+    noise = noisy - clean
+    assert np.corrcoef(noise[:-1], noise[1:])[0, 1] > 0.9
+    with pytest.raises(ValueError):
+        generate_lfp_signal(duration=1.0, noise_color="blue")
+
+
+def test_generate_lfp_signal_pink_noise():
+    """Test that pink noise concentrates its power at low frequencies."""
+    time, clean = generate_lfp_signal(duration=20.0, noise_level=0.0)
+    _, noisy = generate_lfp_signal(
+        duration=20.0, noise_level=0.5, noise_color="pink", seed=42
+    )
+    noise = noisy - clean
+    power = np.abs(np.fft.rfft(noise)) ** 2
+    freqs = np.fft.rfftfreq(len(time), d=0.001)
+    low = power[(freqs > 1) & (freqs < 10)].mean()
+    high = power[(freqs > 100) & (freqs < 400)].mean()
+    assert low > 10 * high
+
+
+@pytest.mark.parametrize("noise_color", ["pink", "ou"])
+@pytest.mark.parametrize("duration", [0.0, 0.001])
+def test_generate_lfp_signal_colored_noise_short(noise_color, duration):
+    """Test colored noise on empty and single-sample recordings."""
+    time, lfp = generate_lfp_signal(duration, noise_color=noise_color, seed=42)
+    assert time.shape == lfp.shape == (int(duration * 1000),)
+    assert np.all(np.isfinite(lfp))
+
+
+def test_bin_spike_train():
+    """Test binning, including a shorter final bin."""
+    spike_train = np.array([1, 0, 1, 1, 0, 0, 1], dtype=np.uint8)
+    np.testing.assert_array_equal(bin_spike_train(spike_train, 3), [2, 1, 1])
+    np.testing.assert_allclose(
+        bin_spike_train(spike_train, 3, method="mean"), [2 / 3, 1 / 3, 1]
+    )
+    with pytest.raises(ValueError):
+        bin_spike_train(spike_train, 3, method="median")
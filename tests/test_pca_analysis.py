@@ -3,25 +3,187 @@ Tests for the pca_analysis module.
 """
 
 import numpy as np
+import pytest
+from scipy import sparse
 from python_4_neuroscience.pca_analysis import (
+    get_component_loadings,
     prepare_data_for_pca,
     perform_pca,
+    plot_pca_projection,
+    plot_variance_explained,
+    reconstruct_from_pca,
 )
 
+# Class labels for the 100 time steps of the sample data
+_LABELS = np.random.default_rng(0).integers(0, 3, size=100)
 
-def test_prepare_data_for_pca():
+# Feature names for the 10 neurons of the sample data, and too few of them
+_FEATURE_NAMES_10 = [f"neuron_{i}" for i in range(10)]
+_FEATURE_NAMES_5 = _FEATURE_NAMES_10[:5]
+
+
+@pytest.fixture(scope="session")
+def sample_neural_data():
+    """Random activity of 10 neurons over 100 time steps."""
+    rng = np.random.default_rng(42)
+    return rng.standard_normal((10, 100))
+
+
+@pytest.fixture(scope="session")
+def prepared_data(sample_neural_data):
+    """Normalized sample data of shape (100, 10)."""
+    return prepare_data_for_pca(sample_neural_data, normalize=True)
+
+
+@pytest.fixture(scope="session")
+def fitted_pca_full(prepared_data):
+    """PCA of the prepared sample data keeping all 10 components."""
+    return perform_pca(prepared_data, n_components=10)
+
+
+def test_prepare_data_for_pca(prepared_data):
     """Test data preparation for PCA."""
-    np.random.seed(42)
-    neural_data = np.random.randn(10, 100)
-    prepared = prepare_data_for_pca(neural_data, normalize=True)
-    assert prepared.shape == (100, 10)
+    assert prepared_data.shape == (100, 10)
 
 
-def test_perform_pca():
-    """Test PCA computation."""
-    np.random.seed(42)
-    neural_data = np.random.randn(10, 100)
+def test_prepare_data_for_pca_without_centering(sample_neural_data):
+    """Test that skipping centering does not change the PCA result."""
+    neural_data = sample_neural_data + 5
+    centered = prepare_data_for_pca(neural_data, normalize=True)
+    scaled = prepare_data_for_pca(neural_data, normalize=True, center=False)
+    np.testing.assert_allclose(
+        scaled - scaled.mean(axis=0), centered, atol=1e-10, rtol=0
+    )
+    _, transformed_centered = perform_pca(centered, n_components=3)
+    _, transformed_scaled = perform_pca(scaled, n_components=3)
+    np.testing.assert_allclose(
+        np.abs(transformed_scaled), np.abs(transformed_centered), atol=1e-10
+    )
+
+
+@pytest.mark.parametrize("offset, scale", [(1e7, 10.0), (1e6, 1.0)])
+def test_prepare_data_for_pca_large_offset(offset, scale):
+    """Test normalization of features whose mean dwarfs their spread."""
+    neural_data = np.random.default_rng(0).normal(offset, scale, (3, 100000))
+    for center in (True, False):
+        prepared = prepare_data_for_pca(neural_data, normalize=True, center=center)
+        np.testing.assert_allclose(prepared.std(axis=0), 1, rtol=1e-6)
+
+
+def test_pca_preserves_float32(sample_neural_data):
+    """Test that single precision data stays single precision."""
+    neural_data = sample_neural_data.astype(np.float32)
     prepared = prepare_data_for_pca(neural_data, normalize=True)
+    assert prepared.dtype == np.float32
     pca, transformed = perform_pca(prepared, n_components=5)
+    assert transformed.dtype == np.float32
+    assert reconstruct_from_pca(pca, transformed).dtype == np.float32
+
+
+def test_perform_pca(prepared_data, fitted_pca_full):
+    """Test PCA computation."""
+    pca, transformed = perform_pca(prepared_data, n_components=5)
     assert transformed.shape == (100, 5)
     assert len(pca.explained_variance_ratio_) == 5
+
+    # A truncated fit keeps the leading components of the full fit
+    pca_full, transformed_full = fitted_pca_full
+    np.testing.assert_allclose(
+        pca.explained_variance_ratio_, pca_full.explained_variance_ratio_[:5]
+    )
+    np.testing.assert_allclose(
+        np.abs(transformed), np.abs(transformed_full[:, :5]), atol=1e-10
+    )
+
+    # Skipping the finiteness check does not change the result
+    _, transformed_unchecked = perform_pca(
+        prepared_data, n_components=5, check_finite=False
+    )
+    np.testing.assert_allclose(transformed_unchecked, transformed)
+
+
+def test_perform_pca_variance_threshold(prepared_data, fitted_pca_full):
+    """Test that n_components is chosen from the variance threshold."""
+    pca, transformed = perform_pca(prepared_data, variance_threshold=0.8)
+    pca_full, _ = fitted_pca_full
+    cumulative_variance = np.cumsum(pca_full.explained_variance_ratio_)
+    n_expected = int(np.argmax(cumulative_variance >= 0.8)) + 1
+    assert pca.n_components_ == n_expected
+    assert transformed.shape == (100, n_expected)
+
+    # A threshold of zero is met by the first component
+    pca, transformed = perform_pca(prepared_data, variance_threshold=0.0)
+    assert pca.n_components_ == 1
+    assert transformed.shape == (100, 1)
+
+
+def test_plot_variance_explained(fitted_pca_full):
+    """Test the variance explained figure."""
+    pca, _ = fitted_pca_full
+    fig = plot_variance_explained(pca)
+    assert len(fig.axes) == 2
+
+
+def test_plot_pca_projection(fitted_pca_full):
+    """Test the projection figure with and without labels."""
+    import matplotlib.pyplot as plt
+
+    _, transformed = fitted_pca_full
+    fig, ax = plt.subplots()
+    assert plot_pca_projection(transformed, ax=ax) is fig
+    assert ax.get_xlabel() == "PC1"
+
+    # Redraw onto the same axes instead of creating another figure
+    ax.cla()
+    fig = plot_pca_projection(transformed, pc_x=1, pc_y=2, labels=_LABELS, ax=ax)
+    # Projection axes plus the colorbar
+    assert len(fig.axes) == 2
+    assert fig.axes[0].get_ylabel() == "PC3"
+
+
+def test_reconstruct_from_pca(prepared_data, fitted_pca_full):
+    """Test reconstruction from all and from a subset of the components."""
+    pca, transformed = fitted_pca_full
+    reconstructed = reconstruct_from_pca(pca, transformed)
+    np.testing.assert_allclose(reconstructed, prepared_data, atol=1e-10, rtol=0)
+
+    partial = reconstruct_from_pca(pca, transformed, n_components=3)
+    assert partial.shape == prepared_data.shape
+    assert np.sum((partial - prepared_data) ** 2) > 0
+
+
+def test_get_component_loadings_with_names(fitted_pca_full):
+    """Test that loadings are returned per feature when names match."""
+    pca, _ = fitted_pca_full
+    loadings = get_component_loadings(pca, feature_names=_FEATURE_NAMES_10)
+    assert loadings.shape == (10, 10)
+    np.testing.assert_allclose(loadings, pca.components_.T)
+
+
+def test_get_component_loadings_wrong_names(fitted_pca_full):
+    """Test that a feature name count mismatch raises an error."""
+    pca, _ = fitted_pca_full
+    with pytest.raises(ValueError, match="feature names"):
+        get_component_loadings(pca, feature_names=_FEATURE_NAMES_5)
+
+
+@pytest.mark.parametrize("kind", ["binary", "counts"])
+def test_perform_pca_sparse(kind):
+    """Test that sparse input gives the same PCA as dense input."""
+    rng = np.random.default_rng(42)
+    if kind == "binary":
+        neural_data = (rng.random((10, 200)) < 0.1).astype(np.uint8)
+    else:
+        # Counts whose squares overflow uint8
+        neural_data = (rng.poisson(0.5, (10, 200)) * 20).astype(np.uint8)
+    prepared_sparse = prepare_data_for_pca(sparse.csr_matrix(neural_data))
+    np.testing.assert_allclose(prepared_sparse.toarray().std(axis=0), 1)
+
+    pca_dense, transformed_dense = perform_pca(prepare_data_for_pca(neural_data), 3)
+    pca_sparse, transformed_sparse = perform_pca(prepared_sparse, 3)
+    np.testing.assert_allclose(
+        pca_sparse.explained_variance_ratio_, pca_dense.explained_variance_ratio_
+    )
+    np.testing.assert_allclose(
+        np.abs(transformed_sparse), np.abs(transformed_dense), atol=1e-10
+    )